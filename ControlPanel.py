@@ -4,8 +4,359 @@
 """
 
 import asyncio
+import enum
+import functools
+import os
+import stat
+import sys
+import threading
+import types
 from core import YCY_FJB_Device, RandomController, start_random_control, stop_random_control
 
+# 菜单文本，一次写出
+MAIN_MENU = (
+    "\n请选择操作：\n"
+    "1. 基础控制（手动设置速度/模式）\n"
+    "2. 随机控制（自动随机操作）\n"
+    "3. 查看设备信息\n"
+    "4. 断开连接并退出\n"
+)
+
+BASIC_MENU = (
+    "\n=== 基础控制 ===\n"
+    "输入 'speed A 10' 设置A通道速度为10\n"
+    "输入 'mode B 3' 设置B通道模式为3\n"
+    "输入 'back' 返回主菜单\n"
+)
+
+RANDOM_MENU = (
+    "\n=== 随机控制 ===\n"
+    "输入 'speed' 启动速度随机控制\n"
+    "输入 'mode' 启动模式随机控制\n"
+    "输入 'back' 返回主菜单\n"
+)
+
+def show_menu(text):
+    """
+    输出菜单文本
+    """
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+# 常用命令词（驻留后可直接用 is 比较）
+_BACK = sys.intern("back")
+_SPEED = sys.intern("speed")
+_MODE = sys.intern("mode")
+
+# 随机控制示例上下限
+RANDOM_LIMITS = types.MappingProxyType({
+    "A": (0, 20),
+    "B": (0, 15),
+    "C": (0, 10)
+})
+
+@functools.lru_cache(maxsize=64)
+def _parse_command(cmd):
+    """
+    解析基础控制命令
+
+    参数：
+    cmd (str): 形如 'speed A 10' 的命令
+
+    返回：
+    tuple or None: (命令类型, 通道, 数值)，格式错误时返回None
+
+    抛出：
+    ValueError: 数值无效
+    """
+    parts = cmd.split()
+    if len(parts) != 3:
+        return None
+    cmd_type, channel, value_str = parts
+    return cmd_type, channel.upper(), int(value_str)
+
+# 启动时预热解析缓存
+_COMMON_COMMANDS = (
+    "speed A 10", "speed B 10", "speed C 10",
+    "speed A 0", "speed B 0", "speed C 0",
+    "mode A 3", "mode B 3", "mode C 3",
+    "mode A 0", "mode B 0", "mode C 0",
+)
+for _cmd in _COMMON_COMMANDS:
+    _parse_command(_cmd)
+del _cmd
+
+class State(enum.Enum):
+    """
+    控制台所处的菜单状态
+    """
+    MAIN = "main"
+    BASIC = "basic"
+    RANDOM = "random"
+    RANDOM_RUNNING = "random_running"
+
+def _read_stdin_in_thread(loop, queue):
+    """
+    在守护线程中逐行读取标准输入（终端、套接字、Windows 及无法异步读取时使用）
+
+    守护线程不会在退出时阻塞解释器，即使它仍停在一次读取上
+    """
+    try:
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(queue.put_nowait, line.strip())
+        loop.call_soon_threadsafe(queue.put_nowait, None)
+    except RuntimeError:
+        # 事件循环已关闭
+        pass
+
+def _stdin_pollable():
+    """
+    判断标准输入能否接入事件循环（仅限不与标准输出/错误共用的管道）
+
+    接入会把标准输入设为 O_NONBLOCK。终端、套接字（inetd、socat 等）上标准输出/错误
+    通常与标准输入是同一个打开的文件，输出较慢或被暂停时 print 会抛出 BlockingIOError，
+    因此这些情况不接入
+    """
+    try:
+        fd = sys.stdin.fileno()
+        st = os.fstat(fd)
+    except (AttributeError, OSError, ValueError):
+        return False
+    if not stat.S_ISFIFO(st.st_mode):
+        return False
+    for out_fd in (1, 2):
+        try:
+            if os.path.samestat(st, os.fstat(out_fd)):
+                return False
+        except OSError:
+            pass
+    return True
+
+async def pump_lines(queue):
+    """
+    将标准输入逐行送入队列，输入结束时放入 None
+
+    POSIX 平台下标准输入为独立的管道时接入事件循环的 StreamReader，不占用线程；
+    终端、套接字、Windows 或无法接入时改由守护线程读取
+    """
+    loop = asyncio.get_running_loop()
+
+    transport = None
+    if sys.platform != "win32" and _stdin_pollable():
+        import fcntl
+
+        # 接入事件循环会把标准输入设为 O_NONBLOCK，退出时需恢复，
+        # 否则共享同一终端的 shell 等进程会读到 EAGAIN
+        fd = sys.stdin.fileno()
+        saved_flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        reader = asyncio.StreamReader()
+        protocol = asyncio.StreamReaderProtocol(reader)
+        try:
+            transport, _ = await loop.connect_read_pipe(lambda: protocol, sys.stdin)
+        except (NotImplementedError, OSError, ValueError):
+            fcntl.fcntl(fd, fcntl.F_SETFL, saved_flags)
+            transport = None
+
+    if transport is None:
+        threading.Thread(target=_read_stdin_in_thread, args=(loop, queue), daemon=True).start()
+        return
+
+    encoding = sys.stdin.encoding or "utf-8"
+    try:
+        async for raw in reader:
+            queue.put_nowait(raw.decode(encoding, errors="replace").strip())
+    finally:
+        transport.close()
+        fcntl.fcntl(fd, fcntl.F_SETFL, saved_flags)
+    queue.put_nowait(None)
+
+class ConsoleSession:
+    """
+    控制台会话
+
+    按当前菜单状态分发每一行输入，所有菜单共用同一个输入来源。
+    """
+
+    PROMPTS = {
+        State.MAIN: "输入选项编号：",
+        State.BASIC: "命令：",
+        State.RANDOM: "命令：",
+        State.RANDOM_RUNNING: "",
+    }
+
+    def __init__(self, device):
+        """
+        初始化控制台会话
+
+        参数：
+        device: YCY_FJB_Device 实例
+        """
+        self.device = device
+        self.controller = RandomController(device)
+        self.state = State.MAIN
+        # 预先绑定常用方法，命令处理时无需重复查找属性
+        self._start_random = self.controller.start
+        self._stop_random = self.controller.stop
+        # 基础控制命令分发表：命令类型 -> (设备方法, 显示名称)
+        self._basic_commands = {
+            _SPEED: (device.set_speed, "速度"),
+            _MODE: (device.set_mode, "模式"),
+        }
+
+    @property
+    def prompt(self):
+        """
+        当前状态对应的输入提示
+        """
+        return self.PROMPTS[self.state]
+
+    async def run(self, queue):
+        """
+        持续从队列中取出输入并处理，直到退出或输入结束
+
+        参数：
+        queue (asyncio.Queue): 输入行队列，None 表示输入结束
+        """
+        show_menu(MAIN_MENU)
+        show_menu(self.prompt)
+        try:
+            while True:
+                line = await queue.get()
+                if line is None or not await self.handle(line):
+                    break
+                show_menu(self.prompt)
+        finally:
+            await self.close()
+
+    async def handle(self, line):
+        """
+        处理一行输入
+
+        参数：
+        line (str): 已去除首尾空白的输入
+
+        返回：
+        bool: 是否继续运行
+        """
+        if self.state is State.MAIN:
+            return await self._handle_main(line)
+        if self.state is State.BASIC:
+            await self._handle_basic(line)
+        elif self.state is State.RANDOM:
+            await self._handle_random(line)
+        else:
+            await self._handle_random_running()
+        return True
+
+    async def close(self):
+        """
+        结束会话，停止仍在运行的随机控制
+        """
+        if self.state is State.RANDOM_RUNNING:
+            await self._stop_random()
+
+    async def _enter_basic(self):
+        """
+        进入基础控制菜单
+        """
+        self.state = State.BASIC
+        show_menu(BASIC_MENU)
+
+    async def _enter_random(self):
+        """
+        进入随机控制菜单
+        """
+        self.state = State.RANDOM
+        show_menu(RANDOM_MENU)
+
+    async def _show_device_info(self):
+        """
+        查看设备信息后回到主菜单
+        """
+        await handle_device_info(self.device)
+        show_menu(MAIN_MENU)
+
+    # 主菜单选项分发表（选项 4 为退出，单独处理）
+    MENU_ACTIONS = {
+        "1": _enter_basic,
+        "2": _enter_random,
+        "3": _show_device_info,
+    }
+
+    async def _handle_main(self, choice):
+        """
+        处理主菜单选项
+        """
+        if choice == "4":
+            # 断开连接并退出
+            return False
+        
+        action = self.MENU_ACTIONS.get(choice)
+        if action is None:
+            print("无效选项，请重新输入！")
+            show_menu(MAIN_MENU)
+        else:
+            await action(self)
+        return True
+
+    def _back_to_main(self):
+        """
+        返回主菜单
+        """
+        self.state = State.MAIN
+        show_menu(MAIN_MENU)
+
+    async def _handle_basic(self, cmd):
+        """
+        处理基础控制命令
+        """
+        if sys.intern(cmd.lower()) is _BACK:
+            self._back_to_main()
+            return
+        
+        try:
+            parsed = _parse_command(cmd)
+            if parsed is None:
+                print("格式错误，请重新输入！")
+                return
+            
+            cmd_type, channel, value = parsed
+            entry = self._basic_commands.get(cmd_type)
+            if entry is None:
+                print("命令类型错误，支持 'speed' 和 'mode'")
+                return
+            
+            handler, label = entry
+            await handler(channel, value)
+            print(f"已设置 {channel} 通道{label}为 {value}")
+        except ValueError as e:
+            print(f"错误：{e}")
+
+    async def _handle_random(self, cmd):
+        """
+        处理随机控制命令
+        """
+        cmd = sys.intern(cmd.lower())
+        if cmd is _BACK:
+            self._back_to_main()
+            return
+        
+        if cmd is not _SPEED and cmd is not _MODE:
+            print("无效命令，支持 'speed' 和 'mode'")
+            return
+        
+        await self._start_random(cmd, RANDOM_LIMITS, auto_loop=True)
+        self.state = State.RANDOM_RUNNING
+        print(f"随机控制已启动（{cmd} 模式），按 Enter 停止...")
+
+    async def _handle_random_running(self):
+        """
+        随机控制运行中，任意输入即停止
+        """
+        await self._stop_random()
+        self.state = State.RANDOM
+        print("随机控制已停止")
+
 async def main():
     print("=== YCY 设备控制面板 ===")
     device = YCY_FJB_Device()
@@ -19,128 +370,56 @@ async def main():
         
         print("设备连接成功！")
         
-        # 主菜单循环
-        while True:
-            print("\n请选择操作：")
-            print("1. 基础控制（手动设置速度/模式）")
-            print("2. 随机控制（自动随机操作）")
-            print("3. 查看设备信息")
-            print("4. 断开连接并退出")
-            
-            choice = input("输入选项编号：").strip()
-            
-            if choice == "1":
-                # 基础控制逻辑
-                await handle_basic_control(device)
-            elif choice == "2":
-                # 随机控制逻辑
-                await handle_random_control(device)
-            elif choice == "3":
-                # 查看设备信息
-                await handle_device_info(device)
-            elif choice == "4":
-                # 断开连接并退出
-                break
-            else:
-                print("无效选项，请重新输入！")
+        # 输入读取与命令处理解耦：读取端持续入队，会话协程常驻处理
+        queue = asyncio.Queue()
+        reader_task = asyncio.create_task(pump_lines(queue))
+        try:
+            await ConsoleSession(device).run(queue)
+        finally:
+            reader_task.cancel()
                 
     finally:
         # 确保断开连接
         await device.disconnect()
         print("设备已断开，程序退出。")
 
-async def handle_basic_control(device):
-    """
-    处理基础控制操作
-    """
-    print("\n=== 基础控制 ===")
-    print("输入 'speed A 10' 设置A通道速度为10")
-    print("输入 'mode B 3' 设置B通道模式为3")
-    print("输入 'back' 返回主菜单")
-    
-    while True:
-        cmd = input("命令：").strip()
-        if cmd.lower() == "back":
-            break
-        
-        parts = cmd.split()
-        if len(parts) != 3:
-            print("格式错误，请重新输入！")
-            continue
-        
-        cmd_type, channel, value_str = parts
-        try:
-            value = int(value_str)
-            if cmd_type == "speed":
-                await device.set_speed(channel.upper(), value)
-                print(f"已设置 {channel.upper()} 通道速度为 {value}")
-            elif cmd_type == "mode":
-                await device.set_mode(channel.upper(), value)
-                print(f"已设置 {channel.upper()} 通道模式为 {value}")
-            else:
-                print("命令类型错误，支持 'speed' 和 'mode'")
-        except ValueError as e:
-            print(f"错误：{e}")
-
-async def handle_random_control(device):
-    """
-    处理随机控制操作
-    """
-    print("\n=== 随机控制 ===")
-    print("输入 'speed' 启动速度随机控制")
-    print("输入 'mode' 启动模式随机控制")
-    print("输入 'back' 返回主菜单")
-    
-    while True:
-        cmd = input("命令：").strip()
-        if cmd.lower() == "back":
-            break
-        
-        if cmd not in ["speed", "mode"]:
-            print("无效命令，支持 'speed' 和 'mode'")
-            continue
-        
-        # 示例上下限
-        limits = {
-            "A": (0, 20),
-            "B": (0, 15),
-            "C": (0, 10)
-        }
-        
-        controller = RandomController(device)
-        await controller.start(cmd, limits, auto_loop=True)
-        print(f"随机控制已启动（{cmd} 模式），按 Enter 停止...")
-        
-        # 等待用户输入停止
-        input()
-        await controller.stop()
-        print("随机控制已停止")
-
 async def handle_device_info(device):
     """
     处理设备信息查询
     """
     print("\n=== 设备信息 ===")
-    info = await device.get_device_info()
-    battery = await device.get_battery()
+    info, battery = await asyncio.gather(
+        device.get_device_info(),
+        device.get_battery(),
+        return_exceptions=True
+    )
     
-    if info:
+    if isinstance(info, Exception):
+        print(f"获取设备信息失败：{info}")
+    elif info:
         print(f"设备信息：{info}")
     else:
         print("获取设备信息失败")
     
-    if battery is not None:
+    if isinstance(battery, Exception):
+        print(f"获取电池电量失败：{battery}")
+    elif battery is not None:
         print(f"电池电量：{battery}%")
     else:
         print("获取电池电量失败")
 
 if __name__ == "__main__":
-    # Windows 兼容
-    if asyncio.get_event_loop_policy().__class__.__name__ == "WindowsSelectorEventLoopPolicy":
-        pass  # 已兼容
+    if sys.platform == "win32":
+        # Windows 兼容
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     else:
-        import sys
-        if sys.platform == "win32":
-            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    
+        # 非 Windows 平台优先使用 uvloop（可选依赖）
+        # 未安装时沿用默认选择器：asyncio 会按最近一个定时任务计算 select 超时，
+        # 随机控制的定时切换不会被延后，因此无需额外限制选择器超时
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+
     asyncio.run(main())
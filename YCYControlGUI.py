@@ -6,10 +6,17 @@ YCY 设备控制 GUI 界面
 import tkinter as tk
 from tkinter import ttk, messagebox
 import asyncio
-import threading
-import queue
+import random
+import time
 from core import YCY_FJB_Device, RandomController
 
+# 通道定义：(通道, 显示名称, 速率上限)
+CHANNELS = [('A', '旋转伸缩', 40), ('B', '吮吸', 20), ('C', '震动', 20)]
+
+# 通道在配置列表中的下标
+CH_A, CH_B, CH_C = 0, 1, 2
+CHANNEL_INDEX = {'A': CH_A, 'B': CH_B, 'C': CH_C}
+
 class YCYControlGUI:
     """
     YCY 设备控制 GUI 类
@@ -43,60 +50,84 @@ class YCYControlGUI:
         self.device = None
         self.controller = None
         self.loop = None
-        self.thread = None
-        self.queue = queue.Queue()
         self.is_connected = False
         self.is_random_running = False
-        # 基础控制配置暂存
-        self.basic_config = {
-            'speed': {'A': 0, 'B': 0, 'C': 0},
-            'mode': {'A': 0, 'B': 0, 'C': 0}
-        }
-        # 记录每个通道最后输入的类型和时间戳
-        self.last_input = {
-            'A': {'type': None, 'timestamp': 0},
-            'B': {'type': None, 'timestamp': 0},
-            'C': {'type': None, 'timestamp': 0}
-        }
+        self._closing = False
+        # 最近一次显示的电池电量，用于跳过重复刷新
+        self._last_battery_level = None
+        # 基础控制配置暂存，按通道下标存放
+        self.speed_cfg = [0, 0, 0]
+        self.mode_cfg = [0, 0, 0]
+        # 记录每个通道最后输入的类型和时间戳（time.monotonic()）
+        self.last_kind = [None, None, None]
+        self.last_ts = [0.0, 0.0, 0.0]
+        # 最近一次启动随机控制时校验通过的上下限，临时停止后恢复时直接使用
+        self._limits_cache = None
+        # 已提交且尚未完成的异步任务
+        self._tasks = set()
 
         # 创建主界面
         self.create_main_window()
 
-        # 启动异步事件循环线程
-        self.start_event_loop()
+        # 预先创建连接进度对话框，连接时显示，结束后隐藏
+        self.create_connecting_dialog()
 
-        # 定期检查队列
-        self.root.after(100, self.check_queue)
+        # 在主线程创建异步事件循环，由 Tk 定时推进
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._step_job = self.root.after(0, self._step_loop)
 
-    def start_event_loop(self):
+    def _step_loop(self):
         """
-        启动异步事件循环线程
+        推进一次异步事件循环，处理完已就绪的回调后交还 Tk 主循环
         """
-        def run_event_loop():
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            try:
-                self.loop.run_forever()
-            finally:
-                self.loop.close()
+        # 弹窗等嵌套的 Tk 事件循环中可能重入，此时跳过本次推进
+        if not self.loop.is_running():
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+        self._step_job = self.root.after(5, self._step_loop)
+
+    def _submit(self, coro_factory):
+        """
+        将协程提交到异步事件循环执行
+
+        参数：
+        coro_factory (callable): 返回协程对象的函数
 
-        self.thread = threading.Thread(target=run_event_loop, daemon=True)
-        self.thread.start()
+        返回：
+        asyncio.Task: 协程对应的任务
+        """
+        task = self.loop.create_task(coro_factory())
+        # 事件循环只弱引用任务，需自行持有直到完成
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(self._report_task_error)
+        return task
 
-    def check_queue(self):
+    def _report_task_error(self, task):
         """
-        检查队列中的任务
+        任务异常结束时弹窗提示
+
+        参数：
+        task (asyncio.Task): 已完成的任务
         """
-        try:
-            while not self.queue.empty():
-                task = self.queue.get(block=False)
-                if callable(task):
-                    task()
-                self.queue.task_done()
-        except queue.Empty:
-            pass
-        finally:
-            self.root.after(100, self.check_queue)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self._post(messagebox.showerror, "错误", f"操作失败: {error}")
+
+    def _post(self, task, *args):
+        """
+        安排界面任务在本次事件循环推进结束后执行
+
+        协程与界面同在主线程，但弹窗等会阻塞的界面操作不应在协程中直接执行
+
+        参数：
+        task (callable): 界面任务
+        *args: 传给界面任务的参数
+        """
+        self.root.after_idle(task, *args)
 
     def create_main_window(self):
         """
@@ -122,7 +153,9 @@ class YCYControlGUI:
         # 电池电量指示灯
         self.battery_canvas = tk.Canvas(battery_status_frame, width=16, height=16, highlightthickness=0)
         self.battery_canvas.pack(side=tk.LEFT, padx=5)
-        self.update_battery_indicator(None)  # 初始状态
+        # 指示灯只创建一次，之后仅修改颜色（初始为未知状态的灰色）
+        self._battery_color = "#CCCCCC"
+        self._battery_oval = self.battery_canvas.create_oval(2, 2, 14, 14, fill=self._battery_color, outline="")
 
         # 电池电量显示
         self.battery_var = tk.StringVar(value="电池电量: 未知")
@@ -172,75 +205,35 @@ class YCYControlGUI:
         speed_frame = ttk.LabelFrame(basic_control_frame, text="速率控制", padding=10)
         speed_frame.pack(fill=tk.X, pady=(0, 15))
 
-        # 旋转伸缩通道
-        a_speed_frame = ttk.Frame(speed_frame)
-        a_speed_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(a_speed_frame, text="旋转伸缩:", width=10).pack(side=tk.LEFT, padx=5)
-        self.a_speed_var = tk.IntVar(value=0)
-        a_speed_entry = ttk.Entry(a_speed_frame, textvariable=self.a_speed_var, width=10)
-        a_speed_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(a_speed_frame, text="(0-40)").pack(side=tk.LEFT, padx=5)
-        ttk.Button(a_speed_frame, text="设置", command=lambda: self.set_speed('A', self.a_speed_var.get())).pack(side=tk.RIGHT, padx=5)
-
-        # 吮吸通道
-        b_speed_frame = ttk.Frame(speed_frame)
-        b_speed_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(b_speed_frame, text="吮吸:", width=10).pack(side=tk.LEFT, padx=5)
-        self.b_speed_var = tk.IntVar(value=0)
-        b_speed_entry = ttk.Entry(b_speed_frame, textvariable=self.b_speed_var, width=10)
-        b_speed_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(b_speed_frame, text="(0-20)").pack(side=tk.LEFT, padx=5)
-        ttk.Button(b_speed_frame, text="设置", command=lambda: self.set_speed('B', self.b_speed_var.get())).pack(side=tk.RIGHT, padx=5)
-
-        # 震动通道
-        c_speed_frame = ttk.Frame(speed_frame)
-        c_speed_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(c_speed_frame, text="震动:", width=10).pack(side=tk.LEFT, padx=5)
-        self.c_speed_var = tk.IntVar(value=0)
-        c_speed_entry = ttk.Entry(c_speed_frame, textvariable=self.c_speed_var, width=10)
-        c_speed_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(c_speed_frame, text="(0-20)").pack(side=tk.LEFT, padx=5)
-        ttk.Button(c_speed_frame, text="设置", command=lambda: self.set_speed('C', self.c_speed_var.get())).pack(side=tk.RIGHT, padx=5)
+        # 各通道速率输入行
+        self.speed_vars = {}
+        for channel, name, max_speed in CHANNELS:
+            row = ttk.Frame(speed_frame)
+            row.pack(fill=tk.X, pady=5)
+
+            ttk.Label(row, text=f"{name}:", width=10).pack(side=tk.LEFT, padx=5)
+            var = tk.IntVar(value=0)
+            ttk.Entry(row, textvariable=var, width=10).pack(side=tk.LEFT, padx=5)
+            ttk.Label(row, text=f"(0-{max_speed})").pack(side=tk.LEFT, padx=5)
+            ttk.Button(row, text="设置", command=lambda ch=channel, v=var: self.set_speed(ch, v.get())).pack(side=tk.RIGHT, padx=5)
+            self.speed_vars[channel] = var
 
         # 内建模式控制
         mode_frame = ttk.LabelFrame(basic_control_frame, text="内建模式控制", padding=10)
         mode_frame.pack(fill=tk.X)
 
-        # 旋转伸缩模式
-        a_mode_frame = ttk.Frame(mode_frame)
-        a_mode_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(a_mode_frame, text="旋转伸缩:", width=10).pack(side=tk.LEFT, padx=5)
-        self.a_mode_var = tk.IntVar(value=0)
-        a_mode_entry = ttk.Entry(a_mode_frame, textvariable=self.a_mode_var, width=10)
-        a_mode_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(a_mode_frame, text="(0-7)").pack(side=tk.LEFT, padx=5)
-        ttk.Button(a_mode_frame, text="设置", command=lambda: self.set_mode('A', self.a_mode_var.get())).pack(side=tk.RIGHT, padx=5)
-
-        # 吮吸模式
-        b_mode_frame = ttk.Frame(mode_frame)
-        b_mode_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(b_mode_frame, text="吮吸:", width=10).pack(side=tk.LEFT, padx=5)
-        self.b_mode_var = tk.IntVar(value=0)
-        b_mode_entry = ttk.Entry(b_mode_frame, textvariable=self.b_mode_var, width=10)
-        b_mode_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(b_mode_frame, text="(0-7)").pack(side=tk.LEFT, padx=5)
-        ttk.Button(b_mode_frame, text="设置", command=lambda: self.set_mode('B', self.b_mode_var.get())).pack(side=tk.RIGHT, padx=5)
-
-        # 震动模式
-        c_mode_frame = ttk.Frame(mode_frame)
-        c_mode_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(c_mode_frame, text="震动:", width=10).pack(side=tk.LEFT, padx=5)
-        self.c_mode_var = tk.IntVar(value=0)
-        c_mode_entry = ttk.Entry(c_mode_frame, textvariable=self.c_mode_var, width=10)
-        c_mode_entry.pack(side=tk.LEFT, padx=5)
-        ttk.Label(c_mode_frame, text="(0-7)").pack(side=tk.LEFT, padx=5)
-        ttk.Button(c_mode_frame, text="设置", command=lambda: self.set_mode('C', self.c_mode_var.get())).pack(side=tk.RIGHT, padx=5)
+        # 各通道模式输入行
+        self.mode_vars = {}
+        for channel, name, _ in CHANNELS:
+            row = ttk.Frame(mode_frame)
+            row.pack(fill=tk.X, pady=5)
+
+            ttk.Label(row, text=f"{name}:", width=10).pack(side=tk.LEFT, padx=5)
+            var = tk.IntVar(value=0)
+            ttk.Entry(row, textvariable=var, width=10).pack(side=tk.LEFT, padx=5)
+            ttk.Label(row, text="(0-7)").pack(side=tk.LEFT, padx=5)
+            ttk.Button(row, text="设置", command=lambda ch=channel, v=var: self.set_mode(ch, v.get())).pack(side=tk.RIGHT, padx=5)
+            self.mode_vars[channel] = var
 
         # 控制按钮
         control_buttons_frame = ttk.Frame(basic_control_frame)
@@ -268,7 +261,11 @@ class YCYControlGUI:
         8. 临时停止（寸止）功能是个好功能，但建议不要太过依赖这个按钮阻止自己强力喷射。
         """
 
-        ttk.Label(info_frame, text=info_text, justify=tk.LEFT, wraplength=800).pack(fill=tk.X)
+        # 说明文字固定不变，用 Message 固定宽度排版，窗口缩放时无需重新计算换行
+        tk.Message(
+            info_frame, text=info_text, width=800, justify=tk.LEFT,
+            font=('Helvetica', 10), background=self.style.lookup('TFrame', 'background')
+        ).pack(fill=tk.X)
 
         # 右侧：随机控制和设备信息
         right_frame = ttk.Frame(control_frame)
@@ -296,38 +293,21 @@ class YCYControlGUI:
         limits_frame = ttk.LabelFrame(random_frame, text="随机速率模式上下限设置", padding=10)
         limits_frame.pack(fill=tk.BOTH, expand=True)
 
-        # 旋转伸缩范围
-        a_limit_frame = ttk.Frame(limits_frame)
-        a_limit_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(a_limit_frame, text="旋转伸缩:", width=10).pack(side=tk.LEFT, padx=5)
-        self.a_min_var = tk.IntVar(value=0)
-        self.a_max_var = tk.IntVar(value=20)
-        ttk.Entry(a_limit_frame, textvariable=self.a_min_var, width=5).pack(side=tk.LEFT, padx=5)
-        ttk.Label(a_limit_frame, text="-").pack(side=tk.LEFT, padx=5)
-        ttk.Entry(a_limit_frame, textvariable=self.a_max_var, width=5).pack(side=tk.LEFT, padx=5)
-
-        # 吮吸范围
-        b_limit_frame = ttk.Frame(limits_frame)
-        b_limit_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(b_limit_frame, text="吮吸:", width=10).pack(side=tk.LEFT, padx=5)
-        self.b_min_var = tk.IntVar(value=0)
-        self.b_max_var = tk.IntVar(value=20)
-        ttk.Entry(b_limit_frame, textvariable=self.b_min_var, width=5).pack(side=tk.LEFT, padx=5)
-        ttk.Label(b_limit_frame, text="-").pack(side=tk.LEFT, padx=5)
-        ttk.Entry(b_limit_frame, textvariable=self.b_max_var, width=5).pack(side=tk.LEFT, padx=5)
-
-        # 震动范围
-        c_limit_frame = ttk.Frame(limits_frame)
-        c_limit_frame.pack(fill=tk.X, pady=5)
-
-        ttk.Label(c_limit_frame, text="震动:", width=10).pack(side=tk.LEFT, padx=5)
-        self.c_min_var = tk.IntVar(value=0)
-        self.c_max_var = tk.IntVar(value=20)
-        ttk.Entry(c_limit_frame, textvariable=self.c_min_var, width=5).pack(side=tk.LEFT, padx=5)
-        ttk.Label(c_limit_frame, text="-").pack(side=tk.LEFT, padx=5)
-        ttk.Entry(c_limit_frame, textvariable=self.c_max_var, width=5).pack(side=tk.LEFT, padx=5)
+        # 各通道范围输入行
+        self.min_vars = {}
+        self.max_vars = {}
+        for channel, name, _ in CHANNELS:
+            row = ttk.Frame(limits_frame)
+            row.pack(fill=tk.X, pady=5)
+
+            ttk.Label(row, text=f"{name}:", width=10).pack(side=tk.LEFT, padx=5)
+            min_var = tk.IntVar(value=0)
+            max_var = tk.IntVar(value=20)
+            ttk.Entry(row, textvariable=min_var, width=5).pack(side=tk.LEFT, padx=5)
+            ttk.Label(row, text="-").pack(side=tk.LEFT, padx=5)
+            ttk.Entry(row, textvariable=max_var, width=5).pack(side=tk.LEFT, padx=5)
+            self.min_vars[channel] = min_var
+            self.max_vars[channel] = max_var
 
         # 随机控制按钮
         random_buttons_frame = ttk.Frame(random_frame)
@@ -364,23 +344,18 @@ class YCYControlGUI:
         elif value == "随机内建模式":
             self.random_mode_var.set("mode")
 
-    def show_connecting_dialog(self):
+    def create_connecting_dialog(self):
         """
-        显示连接进度对话框
+        创建连接进度对话框（初始隐藏）
         """
-        # 创建对话框
         dialog = tk.Toplevel(self.root)
+        dialog.withdraw()
         dialog.title("连接设备")
         dialog.geometry("400x120")
         dialog.resizable(False, False)
         dialog.transient(self.root)
-        dialog.grab_set()
-
-        # 居中显示
-        dialog.update_idletasks()
-        x = (dialog.winfo_screenwidth() // 2) - (400 // 2)
-        y = (dialog.winfo_screenheight() // 2) - (120 // 2)
-        dialog.geometry(f"400x120+{x}+{y}")
+        # 连接过程中不允许手动关闭
+        dialog.protocol("WM_DELETE_WINDOW", lambda: None)
 
         # 标签
         label = ttk.Label(dialog, text="正在扫描并连接设备...", font=('Helvetica', 10))
@@ -389,6 +364,31 @@ class YCYControlGUI:
         # 进度条
         progress = ttk.Progressbar(dialog, length=300, mode='indeterminate')
         progress.pack(pady=10)
+
+        self._connect_dialog = dialog
+        self._connect_label = label
+        self._connect_progress = progress
+
+    def show_connecting_dialog(self, title="连接设备", text="正在扫描并连接设备..."):
+        """
+        显示连接进度对话框
+
+        参数：
+        title (str): 对话框标题
+        text (str): 提示文字
+        """
+        dialog = self._connect_dialog
+        progress = self._connect_progress
+        dialog.title(title)
+        self._connect_label.config(text=text)
+
+        # 居中显示
+        x = (dialog.winfo_screenwidth() // 2) - (400 // 2)
+        y = (dialog.winfo_screenheight() // 2) - (120 // 2)
+        dialog.geometry(f"400x120+{x}+{y}")
+        dialog.deiconify()
+        dialog.grab_set()
+
         progress.start()
 
         return dialog, progress
@@ -405,37 +405,34 @@ class YCYControlGUI:
         # 显示连接进度对话框
         dialog, progress = self.show_connecting_dialog()
 
-        # 在异步线程中执行连接操作
-        def connect_task():
-            async def do_connect():
+        # 在事件循环中执行连接操作
+        async def do_connect():
+            error = None
+            try:
                 self.device = YCY_FJB_Device(device_name)
                 connected = await self.device.connect()
-                
-                # 关闭对话框
-                self.queue.put(lambda:
-                    self.close_connecting_dialog(dialog, progress)
-                )
-                
-                if connected:
-                    # 更新UI
-                    self.queue.put(lambda:
-                        self.on_device_connected()
-                    )
-                    # 获取设备信息
-                    await asyncio.sleep(2)  # 等待通知
-                    await self.get_device_info_async()
-                else:
-                    self.queue.put(lambda:
-                        messagebox.showerror("错误", f"连接设备失败: {device_name}")
-                    )
-                    self.queue.put(lambda:
-                        self.status_var.set("未连接设备")
-                    )
-
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(do_connect(), self.loop)
+            except Exception as e:
+                # 扫描或连接失败时 Bleak 通常直接抛出异常
+                connected = False
+                error = e
+            finally:
+                # 无论成功、失败还是被取消，都关闭对话框
+                self._post(self.close_connecting_dialog, dialog, progress)
+
+            if connected:
+                # 更新UI
+                self._post(self.on_device_connected)
+                # 获取设备信息
+                await asyncio.sleep(2)  # 等待通知
+                await self.get_device_info_async()
+            else:
+                message = f"连接设备失败: {device_name}"
+                if error is not None:
+                    message += f"\n{error}"
+                self._post(messagebox.showerror, "错误", message)
+                self._post(self.status_var.set, "未连接设备")
 
-        threading.Thread(target=connect_task, daemon=True).start()
+        self._submit(do_connect)
 
     def start_basic_control(self):
         """
@@ -447,46 +444,61 @@ class YCYControlGUI:
 
         print("开始执行基础控制配置...")
 
-        # 在异步线程中执行操作
-        def start_task():
-            async def do_start():
-                # 应用配置，根据逻辑决定发送哪个值
-                for channel in ['A', 'B', 'C']:
-                    speed_value = self.basic_config['speed'][channel]
-                    mode_value = self.basic_config['mode'][channel]
-                    last_type = self.last_input[channel]['type']
-
-                    # 根据逻辑决定发送哪个值
-                    if speed_value != 0 and mode_value != 0:
-                        # 都不为0，选择最后输入的
-                        if last_type == 'speed':
-                            await self.device.set_speed(channel, speed_value)
-                            print(f"{channel}通道: 发送速率值 {speed_value}（最后输入的是速率）")
-                        elif last_type == 'mode':
-                            await self.device.set_mode(channel, mode_value)
-                            print(f"{channel}通道: 发送模式值 {mode_value}（最后输入的是模式）")
-                        else:
-                            # 默认发送速率值
-                            await self.device.set_speed(channel, speed_value)
-                            print(f"{channel}通道: 发送速率值 {speed_value}（默认）")
-                    elif speed_value != 0:
-                        # 只有速率不为0
-                        await self.device.set_speed(channel, speed_value)
-                        print(f"{channel}通道: 发送速率值 {speed_value}")
-                    elif mode_value != 0:
-                        # 只有模式不为0
-                        await self.device.set_mode(channel, mode_value)
-                        print(f"{channel}通道: 发送模式值 {mode_value}")
-                    else:
-                        # 都为0，不发送
-                        print(f"{channel}通道: 速率和模式都为0，不发送指令")
-
-                print("基础控制已启动，应用了暂存配置")
-
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(do_start(), self.loop)
-
-        threading.Thread(target=start_task, daemon=True).start()
+        # 在事件循环中执行操作
+        async def do_start():
+            # 应用配置，根据逻辑决定发送哪个值，最后一次性发送
+            speeds, modes = self._collect_config(self.speed_cfg, self.mode_cfg, self.last_kind)
+            await self.device.set_all(speeds, modes)
+
+            print("基础控制已启动，应用了暂存配置")
+
+        self._submit(do_start)
+
+    @staticmethod
+    def _resolve(speed_value, mode_value, last_type):
+        """
+        决定单个通道应发送的指令
+
+        速率和模式都不为0时选择最后输入的一项，未记录时默认发送速率
+
+        参数：
+        speed_value (int): 暂存的速率值
+        mode_value (int): 暂存的模式值
+        last_type (str or None): 最后输入的类型（'speed'/'mode'）
+
+        返回：
+        tuple or None: ('speed', 值) 或 ('mode', 值)，都为0时返回None
+        """
+        if speed_value and (not mode_value or last_type != 'mode'):
+            return 'speed', speed_value
+        if mode_value:
+            return 'mode', mode_value
+        return None
+
+    def _collect_config(self, speed_cfg, mode_cfg, kinds, prefix=""):
+        """
+        将暂存配置整理为 set_all 所需的速率和模式字典
+
+        参数：
+        speed_cfg (list): 各通道暂存速率
+        mode_cfg (list): 各通道暂存模式
+        kinds (list): 各通道最后输入的类型
+        prefix (str): 日志前缀
+
+        返回：
+        tuple: (速率字典, 模式字典)
+        """
+        writes = {'speed': {}, 'mode': {}}
+        for i, (channel, _, _) in enumerate(CHANNELS):
+            r = self._resolve(speed_cfg[i], mode_cfg[i], kinds[i])
+            if r is None:
+                print(f"{prefix}{channel}通道: 速率和模式都为0，不发送指令")
+                continue
+            kind, value = r
+            writes[kind][channel] = value
+            label = "速率" if kind == 'speed' else "模式"
+            print(f"{prefix}{channel}通道: 发送{label}值 {value}")
+        return writes['speed'], writes['mode']
 
     def stop_all_controls(self):
         """
@@ -501,23 +513,15 @@ class YCYControlGUI:
             self.stop_random_control()
 
         # 停止所有通道的控制
-        def stop_task():
-            async def do_stop():
-                # 停止所有马达
-                await self.device.set_speed('A', 0)
-                await self.device.set_speed('B', 0)
-                await self.device.set_speed('C', 0)
-                await self.device.set_mode('A', 0)
-                await self.device.set_mode('B', 0)
-                await self.device.set_mode('C', 0)
-                self.queue.put(lambda:
-                    messagebox.showinfo("成功", "所有控制已停止")
-                )
-
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(do_stop(), self.loop)
-
-        threading.Thread(target=stop_task, daemon=True).start()
+        async def do_stop():
+            # 停止所有马达
+            await self.device.set_all(
+                {'A': 0, 'B': 0, 'C': 0},
+                {'A': 0, 'B': 0, 'C': 0}
+            )
+            self._post(messagebox.showinfo, "成功", "所有控制已停止")
+
+        self._submit(do_stop)
 
     def temp_pause(self):
         """
@@ -531,95 +535,62 @@ class YCYControlGUI:
         print("开始临时停止...")
 
         # 保存当前配置
-        current_config = {
-            'speed': {k: v for k, v in self.basic_config['speed'].items()},
-            'mode': {k: v for k, v in self.basic_config['mode'].items()}
-        }
-        current_last_input = {
-            k: {'type': v['type'], 'timestamp': v['timestamp']} 
-            for k, v in self.last_input.items()
-        }
+        saved_speed = self.speed_cfg[:]
+        saved_mode = self.mode_cfg[:]
+        saved_kind = self.last_kind[:]
         # 保存随机控制状态
         is_random_running = self.is_random_running
         random_controller = self.controller if self.is_random_running else None
 
         # 生成10-30秒的随机时间
-        import random
         pause_time = random.randint(10, 30)
         print(f"临时停止时间: {pause_time}秒")
 
-        # 在新线程中执行暂停和恢复操作
-        def pause_task():
-            async def do_pause():
-                # 如果随机控制正在运行，停止它
-                if is_random_running and random_controller:
-                    print("暂停随机控制...")
-                    await random_controller.stop()
-
-                # 停止所有通道
-                for channel in ['A', 'B', 'C']:
-                    await self.device.set_speed(channel, 0)
-                    await self.device.set_mode(channel, 0)
-
-                # 等待随机时间
-                await asyncio.sleep(pause_time)
-
-                # 恢复之前的配置
-                if is_random_running and random_controller:
-                    # 恢复随机控制
-                    print("恢复随机控制...")
-                    # 重新启动随机控制，使用之前的模式和范围
-                    try:
-                        mode = self.random_mode_var.get()
-                        if mode not in ['speed', 'mode']:
-                            mode = 'speed'
-                        limits = {
-                            'A': (self.a_min_var.get(), self.a_max_var.get()),
-                            'B': (self.b_min_var.get(), self.b_max_var.get()),
-                            'C': (self.c_min_var.get(), self.c_max_var.get())
-                        }
-                        await random_controller.start(mode, limits, auto_loop=True)
-                        print("随机控制已恢复")
-                    except Exception as e:
-                        print(f"恢复随机控制失败: {e}")
-                else:
-                    # 恢复基础控制配置
-                    for channel in ['A', 'B', 'C']:
-                        speed_value = current_config['speed'][channel]
-                        mode_value = current_config['mode'][channel]
-                        last_type = current_last_input[channel]['type']
-
-                        # 根据之前的逻辑恢复配置
-                        if speed_value != 0 and mode_value != 0:
-                            if last_type == 'speed':
-                                await self.device.set_speed(channel, speed_value)
-                                print(f"恢复{channel}通道: 发送速率值 {speed_value}（最后输入的是速率）")
-                            elif last_type == 'mode':
-                                await self.device.set_mode(channel, mode_value)
-                                print(f"恢复{channel}通道: 发送模式值 {mode_value}（最后输入的是模式）")
-                            else:
-                                await self.device.set_speed(channel, speed_value)
-                                print(f"恢复{channel}通道: 发送速率值 {speed_value}（默认）")
-                        elif speed_value != 0:
-                            await self.device.set_speed(channel, speed_value)
-                            print(f"恢复{channel}通道: 发送速率值 {speed_value}")
-                        elif mode_value != 0:
-                            await self.device.set_mode(channel, mode_value)
-                            print(f"恢复{channel}通道: 发送模式值 {mode_value}")
-
-                print(f"临时停止结束，已恢复控制")
-
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(do_pause(), self.loop)
-
-        threading.Thread(target=pause_task, daemon=True).start()
+        # 在事件循环中执行暂停和恢复操作
+        async def do_pause():
+            # 如果随机控制正在运行，停止它
+            if is_random_running and random_controller:
+                print("暂停随机控制...")
+                await random_controller.stop()
+
+            # 停止所有通道
+            await self.device.set_all(
+                {'A': 0, 'B': 0, 'C': 0},
+                {'A': 0, 'B': 0, 'C': 0}
+            )
+
+            # 等待随机时间
+            await asyncio.sleep(pause_time)
+
+            # 恢复之前的配置
+            if is_random_running and random_controller:
+                # 恢复随机控制
+                print("恢复随机控制...")
+                # 重新启动随机控制，使用之前的模式和范围
+                try:
+                    mode = self.random_mode_var.get()
+                    if mode not in ['speed', 'mode']:
+                        mode = 'speed'
+                    await random_controller.start(mode, self._limits_cache, auto_loop=True)
+                    print("随机控制已恢复")
+                except Exception as e:
+                    print(f"恢复随机控制失败: {e}")
+            else:
+                # 恢复基础控制配置，收集后一次性发送
+                speeds, modes = self._collect_config(saved_speed, saved_mode, saved_kind, "恢复")
+                await self.device.set_all(speeds, modes)
+
+            print(f"临时停止结束，已恢复控制")
+
+        self._submit(do_pause)
 
     def close_connecting_dialog(self, dialog, progress):
         """
         关闭连接进度对话框
         """
         progress.stop()
-        dialog.destroy()
+        dialog.grab_release()
+        dialog.withdraw()
 
     def update_battery_indicator(self, battery_level):
         """
@@ -628,8 +599,6 @@ class YCYControlGUI:
         参数：
         battery_level (int or None): 电池电量百分比
         """
-        self.battery_canvas.delete("all")
-        
         if battery_level is None:
             # 未知状态
             color = "#CCCCCC"  # 灰色
@@ -643,19 +612,30 @@ class YCYControlGUI:
             # 高电量
             color = "#44AA44"  # 绿色
         
-        # 绘制圆形指示灯
-        self.battery_canvas.create_oval(2, 2, 14, 14, fill=color, outline="")
+        # 颜色未变化时无需重绘
+        if color == self._battery_color:
+            return
+        self._battery_color = color
+        self.battery_canvas.itemconfig(self._battery_oval, fill=color)
 
     def on_battery_update(self, battery_level):
         """
         电池电量更新回调
         """
-        self.queue.put(lambda:
-            self.battery_var.set(f"电池电量: {battery_level}%")
-        )
-        self.queue.put(lambda:
-            self.update_battery_indicator(battery_level)
-        )
+        self._post(self._apply_battery, battery_level)
+
+    def _apply_battery(self, battery_level):
+        """
+        刷新电池电量文字和指示灯，电量未变化时跳过
+
+        参数：
+        battery_level (int): 电池电量百分比
+        """
+        if battery_level == self._last_battery_level:
+            return
+        self._last_battery_level = battery_level
+        self.battery_var.set(f"电池电量: {battery_level}%")
+        self.update_battery_indicator(battery_level)
 
     def on_device_connected(self):
         """
@@ -681,19 +661,13 @@ class YCYControlGUI:
         if self.is_random_running:
             self.stop_random_control()
 
-        # 在异步线程中执行断开操作
-        def disconnect_task():
-            async def do_disconnect():
-                if self.device:
-                    await self.device.disconnect()
-                self.queue.put(lambda:
-                    self.on_device_disconnected()
-                )
-
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(do_disconnect(), self.loop)
+        # 在事件循环中执行断开操作
+        async def do_disconnect():
+            if self.device:
+                await self.device.disconnect()
+            self._post(self.on_device_disconnected)
 
-        threading.Thread(target=disconnect_task, daemon=True).start()
+        self._submit(do_disconnect)
 
     def on_device_disconnected(self):
         """
@@ -702,6 +676,7 @@ class YCYControlGUI:
         self.is_connected = False
         self.status_var.set("未连接设备")
         self.battery_var.set("电池电量: 未知")
+        self._last_battery_level = None
         self.disconnect_btn.config(state=tk.DISABLED)
         self.device = None
         messagebox.showinfo("成功", "设备已断开连接")
@@ -714,25 +689,19 @@ class YCYControlGUI:
             messagebox.showinfo("提示", "请先连接设备")
             return
 
-        try:
-            # 验证值范围
-            if channel == 'A':
-                if not 0 <= value <= 40:
-                    raise ValueError("A通道速率必须在0-40之间")
-            else:
-                if not 0 <= value <= 20:
-                    raise ValueError(f"{channel}通道速率必须在0-20之间")
-
-            # 暂存配置
-            self.basic_config['speed'][channel] = value
-            # 更新时间戳
-            import time
-            self.last_input[channel]['type'] = 'speed'
-            self.last_input[channel]['timestamp'] = time.time()
-            print(f"已暂存{channel}通道速率配置: {value}")
+        # 验证值范围
+        hi = 40 if channel == 'A' else 20
+        if not 0 <= value <= hi:
+            messagebox.showerror("错误", f"{channel}通道速率必须在0-{hi}之间")
+            return
 
-        except ValueError as e:
-            messagebox.showerror("错误", str(e))
+        # 暂存配置
+        i = CHANNEL_INDEX[channel]
+        self.speed_cfg[i] = value
+        # 更新时间戳
+        self.last_kind[i] = 'speed'
+        self.last_ts[i] = time.monotonic()
+        print(f"已暂存{channel}通道速率配置: {value}")
 
     def set_mode(self, channel, value):
         """
@@ -742,21 +711,18 @@ class YCYControlGUI:
             messagebox.showinfo("提示", "请先连接设备")
             return
 
-        try:
-            # 验证值范围
-            if not 0 <= value <= 7:
-                raise ValueError("模式值必须在0-7之间")
-
-            # 暂存配置
-            self.basic_config['mode'][channel] = value
-            # 更新时间戳
-            import time
-            self.last_input[channel]['type'] = 'mode'
-            self.last_input[channel]['timestamp'] = time.time()
-            print(f"已暂存{channel}通道模式配置: {value}")
+        # 验证值范围
+        if not 0 <= value <= 7:
+            messagebox.showerror("错误", "模式值必须在0-7之间")
+            return
 
-        except ValueError as e:
-            messagebox.showerror("错误", str(e))
+        # 暂存配置
+        i = CHANNEL_INDEX[channel]
+        self.mode_cfg[i] = value
+        # 更新时间戳
+        self.last_kind[i] = 'mode'
+        self.last_ts[i] = time.monotonic()
+        print(f"已暂存{channel}通道模式配置: {value}")
 
     def start_random_control(self):
         """
@@ -775,9 +741,8 @@ class YCYControlGUI:
                 mode = 'speed'
                 self.random_mode_var.set('speed')
             limits = {
-                'A': (self.a_min_var.get(), self.a_max_var.get()),
-                'B': (self.b_min_var.get(), self.b_max_var.get()),
-                'C': (self.c_min_var.get(), self.c_max_var.get())
+                channel: (self.min_vars[channel].get(), self.max_vars[channel].get())
+                for channel, _, _ in CHANNELS
             }
 
             # 验证参数
@@ -789,21 +754,17 @@ class YCYControlGUI:
                     if not (0 <= min_val <= max_val <= 20):
                         raise ValueError(f"{channel}通道范围必须在0-20之间，且最小值≤最大值")
 
+            self._limits_cache = limits
+
             # 创建控制器
             self.controller = RandomController(self.device)
 
             # 启动随机控制
-            def start_task():
-                async def do_start():
-                    await self.controller.start(mode, limits, auto_loop=True)
-                    self.queue.put(lambda:
-                        self.on_random_control_started()
-                    )
-
-                if self.loop:
-                    asyncio.run_coroutine_threadsafe(do_start(), self.loop)
+            async def do_start():
+                await self.controller.start(mode, limits, auto_loop=True)
+                self._post(self.on_random_control_started)
 
-            threading.Thread(target=start_task, daemon=True).start()
+            self._submit(do_start)
 
         except ValueError as e:
             messagebox.showerror("错误", str(e))
@@ -826,18 +787,12 @@ class YCYControlGUI:
             messagebox.showinfo("提示", "随机控制未启动")
             return
 
-        def stop_task():
-            async def do_stop():
-                if self.controller:
-                    await self.controller.stop()
-                self.queue.put(lambda:
-                    self.on_random_control_stopped()
-                )
+        async def do_stop():
+            if self.controller:
+                await self.controller.stop()
+            self._post(self.on_random_control_stopped)
 
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(do_stop(), self.loop)
-
-        threading.Thread(target=stop_task, daemon=True).start()
+        self._submit(do_stop)
 
     def on_random_control_stopped(self):
         """
@@ -856,12 +811,7 @@ class YCYControlGUI:
             messagebox.showinfo("提示", "请先连接设备")
             return
 
-        # 在异步线程中执行操作
-        def get_info_task():
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(self.get_device_info_async(), self.loop)
-
-        threading.Thread(target=get_info_task, daemon=True).start()
+        self._submit(self.get_device_info_async)
 
     async def get_device_info_async(self):
         """
@@ -883,18 +833,11 @@ class YCYControlGUI:
 
             if battery is not None:
                 info_text += f"电池电量: {battery}%\n"
-                self.queue.put(lambda:
-                    self.battery_var.set(f"电池电量: {battery}%")
-                )
-                self.queue.put(lambda:
-                    self.update_battery_indicator(battery)
-                )
+                self._post(self._apply_battery, battery)
             else:
                 info_text += "获取电池电量失败\n"
 
-            self.queue.put(lambda:
-                self.update_device_info(info_text)
-            )
+            self._post(self.update_device_info, info_text)
 
     def update_device_info(self, info_text):
         """
@@ -909,26 +852,47 @@ class YCYControlGUI:
         """
         窗口关闭时的处理
         """
-        if self.is_connected:
-            # 断开设备连接
-            def close_task():
-                async def do_close():
-                    if self.device:
-                        await self.device.disconnect()
-                        # 等待操作完成
-                        await asyncio.sleep(1)
-                if self.loop:
-                    asyncio.run_coroutine_threadsafe(do_close(), self.loop)
-                    # 停止事件循环
-                    self.loop.call_soon_threadsafe(self.loop.stop)
-
-            threading.Thread(target=close_task, daemon=True).start()
-            # 等待线程完成
-            import time
-            time.sleep(1)
+        if self._closing:
+            return
+        self._closing = True
+
+        if not (self.is_connected and self.device):
+            self._finalize_shutdown()
+            return
+
+        # 断开设备连接，完成后再销毁窗口，期间界面保持响应
+        self.show_connecting_dialog("断开连接", "正在断开设备连接...")
+
+        async def do_close():
+            try:
+                await asyncio.wait_for(self.device.disconnect(), timeout=3)
+            except Exception as e:
+                print(f"断开连接失败: {e}")
+
+        task = self._submit(do_close)
+        task.add_done_callback(lambda _: self._post(self._finalize_shutdown))
 
+    def _finalize_shutdown(self):
+        """
+        关闭事件循环并销毁窗口
+        """
+        self._close_loop()
         self.root.destroy()
 
+    def _close_loop(self):
+        """
+        停止推进事件循环，取消剩余任务并关闭事件循环
+        """
+        self.root.after_cancel(self._step_job)
+        if self.loop.is_running():
+            return
+        pending = asyncio.all_tasks(self.loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.close()
+
 if __name__ == "__main__":
     # 创建主窗口
     root = tk.Tk()
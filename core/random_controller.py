@@ -118,7 +118,6 @@ async def example_continuous_execution():
 
 import asyncio
 import random
-import time
 from typing import Dict, List, Optional, Tuple, Callable
 import logging
 
@@ -146,13 +145,16 @@ class RandomController:
         device: YCY_FJB_Device 实例
         """
         self.device = device
+        # 控制器独立的随机数生成器
+        self._rng = random.Random()
         self.is_running = False
         self.mode = None  # 'speed' 或 'mode'
-        self.limits = {'A': (0, 20), 'B': (1, 20), 'C': (0, 20)}  # 默认上下限
+        self._set_limits({'A': (0, 20), 'B': (1, 20), 'C': (0, 20)})  # 默认上下限
         self.auto_loop = True  # 是否自动循环
         self.task = None
         self.b_channel_timer = None  # B通道吸气定时器
         self.last_b_command_time = 0  # 最后发送B通道命令的时间
+        self._loop = None  # 运行随机控制的事件循环，start() 时记录
 
     async def start(self, mode: str, limits: Dict[str, Tuple[int, int]], auto_loop: bool = True):
         """
@@ -182,7 +184,8 @@ class RandomController:
                     raise ValueError(f"{channel}通道上下限必须在0-20之间，且下限≤上限")
 
         self.mode = mode
-        self.limits = limits
+        self._set_limits(limits)
+        self._loop = asyncio.get_running_loop()
         self.auto_loop = auto_loop
 
         if self.is_running:
@@ -191,11 +194,11 @@ class RandomController:
         self.is_running = True
         if auto_loop:
             self.task = asyncio.create_task(self._random_loop())
-            logger.info(f"随机控制已启动，模式: {mode}，定时循环")
+            logger.info("随机控制已启动，模式: %s，定时循环", mode)
         else:
             # 不定时模式：执行一次后保持状态
             await self._execute_once()
-            logger.info(f"随机控制已启动，模式: {mode}，不定时（保持当前状态）")
+            logger.info("随机控制已启动，模式: %s，不定时（保持当前状态）", mode)
 
     async def stop(self):
         """
@@ -204,20 +207,20 @@ class RandomController:
         self.is_running = False
         if self.task and not self.task.done():
             self.task.cancel()
+            # 最多等待0.5秒让循环任务退出
             try:
-                await self.task
-            except asyncio.CancelledError:
+                await asyncio.wait_for(self.task, 0.5)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
 
-        # 停止所有马达
-        if self.mode == 'speed':
-            await self.device.set_speed('A', 0)
-            await self.device.set_speed('B', 0)
-            await self.device.set_speed('C', 0)
-        else:
-            await self.device.set_mode('A', 0)
-            await self.device.set_mode('B', 0)
-            await self.device.set_mode('C', 0)
+        # 停止所有马达，即使 stop() 自身被取消也保证指令发出
+        all_off = asyncio.ensure_future(self._all_off())
+        try:
+            await asyncio.shield(all_off)
+        except asyncio.CancelledError:
+            # stop() 被取消后无人取回写入结果，由回调取回并记录
+            all_off.add_done_callback(self._log_all_off_error)
+            raise
 
         # 取消B通道定时器
         if self.b_channel_timer:
@@ -226,20 +229,36 @@ class RandomController:
 
         logger.info("随机控制已停止")
 
-    def _generate_random_value(self, channel: str, exclude_values: List[int] = None) -> int:
+    @staticmethod
+    def _log_all_off_error(future):
         """
-        为指定通道生成随机值
+        取回并记录关闭所有通道时的异常（stop() 被取消后使用）
+        """
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("关闭所有通道失败: %s", future.exception())
+
+    async def _all_off(self):
+        """
+        关闭所有通道：速率一次写入三个通道，模式逐条发送
+        """
+        if self.mode == 'speed':
+            await self.device.set_all(speeds={'A': 0, 'B': 0, 'C': 0})
+        else:
+            await self.device.set_all(modes={'A': 0, 'B': 0, 'C': 0})
+
+    @staticmethod
+    def _allowed_values(channel: str, min_val: int, max_val: int) -> Tuple[int, ...]:
+        """
+        计算通道在上下限内可取的全部值
 
         参数：
         channel (str): 通道 'A', 'B', 'C'
-        exclude_values (list): 要排除的值列表
+        min_val (int): 下限
+        max_val (int): 上限
 
         返回：
-        int: 随机值
+        tuple: 可取值
         """
-        min_val, max_val = self.limits[channel]
-        exclude_values = exclude_values or []
-
         # A通道特殊处理
         if channel == 'A':
             # 0为暂停，1-20正转，21-40反转
@@ -262,20 +281,43 @@ class RandomController:
             if reverse_min <= reverse_max:
                 possible_values.extend(range(reverse_min, reverse_max + 1))
 
-            # 移除排除的值
-            possible_values = [v for v in possible_values if v not in exclude_values]
+            # 如果没有可用值，只取下限
+            return tuple(possible_values) or (min_val,)
 
-            if not possible_values:
-                # 如果没有可用值，返回下限
-                return min_val
+        # B和C通道直接从上下限范围内选择
+        return tuple(range(min_val, max_val + 1)) or (min_val,)
 
-            return random.choice(possible_values)
-        else:
-            # B和C通道直接从上下限范围内选择
-            possible_values = [v for v in range(min_val, max_val + 1) if v not in exclude_values]
-            if not possible_values:
-                return min_val
-            return random.choice(possible_values)
+    def _set_limits(self, limits: Dict[str, Tuple[int, int]]):
+        """
+        保存上下限，并预先计算各通道可取值
+        """
+        self.limits = limits
+        self._allowed = {
+            channel: self._allowed_values(channel, min_val, max_val)
+            for channel, (min_val, max_val) in limits.items()
+        }
+
+    def _generate_random_value(self, channel: str, exclude_values: Optional[List[int]] = None) -> int:
+        """
+        为指定通道生成随机值
+
+        参数：
+        channel (str): 通道 'A', 'B', 'C'
+        exclude_values (list): 要排除的值列表
+
+        返回：
+        int: 随机值
+        """
+        allowed = self._allowed[channel]
+        if not exclude_values:
+            return self._rng.choice(allowed)
+
+        exclude = frozenset(exclude_values)
+        possible_values = [v for v in allowed if v not in exclude]
+        if not possible_values:
+            # 如果没有可用值，返回下限
+            return self.limits[channel][0]
+        return self._rng.choice(possible_values)
 
     def _generate_frequency_delay(self) -> float:
         """
@@ -284,7 +326,7 @@ class RandomController:
         返回：
         float: 延迟时间（秒）
         """
-        return random.uniform(3.0, 11.0)
+        return 3.0 + self._rng.random() * 8.0
 
     async def _handle_b_channel_exhale(self):
         """
@@ -295,7 +337,7 @@ class RandomController:
                 await self.device.set_speed('B', 0)
                 logger.debug("B通道自动放气")
         except Exception as e:
-            logger.error(f"B通道自动放气失败: {e}")
+            logger.error("B通道自动放气失败: %s", e)
 
     async def _handle_b_channel_exhale_cycle(self, inhale_duration: float):
         """
@@ -309,7 +351,7 @@ class RandomController:
             exhale_duration = inhale_duration * 0.6
             exhale_duration = max(0.5, min(exhale_duration, 3.0))  # 限制在0.5-3秒
 
-            logger.debug(f"B通道开始放气，持续时间: {exhale_duration:.1f}秒")
+            logger.debug("B通道开始放气，持续时间: %.1f秒", exhale_duration)
 
             # 发送放气命令（设置为0）
             await self.device.set_speed('B', 0)
@@ -320,7 +362,7 @@ class RandomController:
             logger.debug("B通道放气完成")
 
         except Exception as e:
-            logger.error(f"B通道循环放气失败: {e}")
+            logger.error("B通道循环放气失败: %s", e)
 
     async def _random_loop(self):
         """
@@ -329,7 +371,7 @@ class RandomController:
         logger.info("随机控制主循环已启动")
         while self.is_running and self.auto_loop:
             try:
-                logger.info(f"开始新一轮随机控制，模式: {self.mode}")
+                logger.info("开始新一轮随机控制，模式: %s", self.mode)
                 if self.mode == 'speed':
                     await self._execute_speed_mode()
                 elif self.mode == 'mode':
@@ -337,7 +379,7 @@ class RandomController:
 
                 # 保持当前随机值一段时间（随机5-15s）
                 hold_duration = self._generate_frequency_delay()
-                logger.info(f"保持当前状态 {hold_duration:.1f} 秒")
+                logger.info("保持当前状态 %.1f 秒", hold_duration)
                 await asyncio.sleep(hold_duration)
 
                 # Speed模式：循环结束放气
@@ -346,7 +388,7 @@ class RandomController:
                     await self._handle_b_channel_exhale_cycle(hold_duration)
 
             except Exception as e:
-                logger.error(f"随机控制循环出错: {e}")
+                logger.error("随机控制循环出错: %s", e)
                 import traceback
                 logger.error(traceback.format_exc())
                 await asyncio.sleep(1)  # 出错后等待1秒再继续
@@ -369,7 +411,7 @@ class RandomController:
                 await self._handle_b_channel_exhale_cycle(10)
 
         except Exception as e:
-            logger.error(f"单次随机控制执行出错: {e}")
+            logger.error("单次随机控制执行出错: %s", e)
 
     async def _execute_speed_mode(self):
         """
@@ -381,17 +423,19 @@ class RandomController:
         for channel in ['A', 'B', 'C']:
             values[channel] = self._generate_random_value(channel)
 
-        # 发送命令到设备
-        await self.device.set_speed('A', values['A'])
-        await self.device.set_speed('C', values['C'])
-        await self.device.set_speed('B', values['B'] if values['B'] > 0 else 0)
+        # 发送命令到设备，三个通道合并为一次写入
+        await self.device.set_all(speeds={
+            'A': values['A'],
+            'B': values['B'] if values['B'] > 0 else 0,
+            'C': values['C']
+        })
         
         # 记录吸气开始时间（如果需要）
         if values['B'] > 0:
-            self.last_b_command_time = asyncio.get_event_loop().time()
+            self.last_b_command_time = self._loop.time()
         
         # 使用 info 级别日志，确保能看到执行信息
-        logger.info(f"速率模式设置完成: A={values['A']}, B={values['B'] if values['B'] > 0 else 0}, C={values['C']}")
+        logger.info("速率模式设置完成: A=%s, B=%s, C=%s", values['A'], values['B'] if values['B'] > 0 else 0, values['C'])
 
     async def _schedule_exhale(self, delay: float):
         """
@@ -412,13 +456,15 @@ class RandomController:
 
         for channel in ['A', 'B', 'C']:
             # 模式范围1-7，避免0关闭，不要求完全不同
-            mode_value = random.randint(1, 7)
+            mode_value = self._rng.randint(1, 7)
             values[channel] = mode_value
 
         # 发送模式命令
+        debug = logger.isEnabledFor(logging.DEBUG)
         for channel, mode_value in values.items():
             await self.device.set_mode(channel, mode_value)
-            logger.debug(f"{channel}通道设置模式: {mode_value}")
+            if debug:
+                logger.debug("%s通道设置模式: %s", channel, mode_value)
 
     @property
     def status(self) -> Dict:
@@ -18,6 +18,7 @@ API使用说明：
 3. 控制马达：
    - 设置速率：await device.set_speed('A', 10)  # A马达速率10
    - 设置模式：await device.set_mode('B', 3)    # B马达模式3
+   - 批量设置：await device.set_all({'A': 10, 'C': 5}, {'B': 3})
 4. 获取信息：
    - 获取设备信息：info = await device.get_device_info()
    - 获取电池电量：battery = await device.get_battery()
@@ -32,14 +33,22 @@ API使用说明：
 """
 
 import asyncio
+import functools
 from bleak import BleakScanner, BleakClient
 import sys
 
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 # 根据协议定义UUID
 SERVICE_UUID = "0000ff40-0000-1000-8000-00805f9b34fb"
 WRITE_CHAR_UUID = "0000ff41-0000-1000-8000-00805f9b34fb"
 NOTIFY_CHAR_UUID = "0000ff42-0000-1000-8000-00805f9b34fb"
 
+# 速率设置合并窗口（秒）：窗口内的多次速率设置合并为一次写入
+SPEED_COALESCE_DELAY = 0.005
+
 def calculate_checksum(data):
     """
     计算校验和：所有字节的和取模256
@@ -52,6 +61,31 @@ def calculate_checksum(data):
     """
     return sum(data) % 256
 
+# 设备心跳包
+HEARTBEAT = b'\x35\x14\x49'
+
+# 马达标识到模式控制命令中马达编码的映射
+MOTOR_CODES = {'A': 0x01, 'B': 0x12, 'C': 0x14}
+
+# 马达标识到速率控制命令帧中速率字节下标的映射
+_SPEED_SLOT = {'A': 2, 'B': 3, 'C': 4}
+
+@functools.lru_cache(maxsize=64)
+def _encode_mode(motor_code, mode_value):
+    """
+    编码固定模式控制命令帧（结果缓存复用）
+
+    参数：
+    motor_code (int): 马达编码
+    mode_value (int): 模式值
+
+    返回：
+    bytes: 命令帧 [0x35, 0x11, 马达编码, 模式, 校验和]
+    """
+    # 帧头与命令字之和为常量 0x46
+    return bytes((0x35, 0x11, motor_code, mode_value,
+                  (0x46 + motor_code + mode_value) & 0xFF))
+
 class YCY_FJB_Device:
     """
     YCY-FJB 设备控制类
@@ -69,10 +103,18 @@ class YCY_FJB_Device:
         self.device_name = device_name
         self.client = None
         self.device_info = None
-        self.current_levels = {'A': 0, 'B': 0, 'C': 0}
+        # 速率控制命令帧 [0x35, 0x12, A, B, C, 校验和]，三个通道的当前速率直接存放在帧内
+        self._speed_pkt = bytearray(b'\x35\x12\x00\x00\x00\x47')
         self.battery_level = None
         self._connected = False
         self.battery_callback = None
+        # 设备信息响应到达事件（需要事件循环，首次查询时创建）
+        self._info_event = None
+        # 待发送的合并速率写入任务，及串行化所有写入的锁（需要事件循环，首次使用时创建）
+        self._speed_flush = None
+        self._write_lock = None
+        # 每次合并写入仍在等待结果的请求方数量
+        self._flush_waiters = {}
 
     async def notification_handler(self, sender, data):
         """
@@ -82,24 +124,28 @@ class YCY_FJB_Device:
         sender: 发送者
         data: 接收到的数据字节
         """
-        data_list = list(data)
-        if len(data_list) < 3 or data_list[0] != 0x35:
-            print("接收到无效数据")
+        # 心跳包最为频繁，静默忽略，不打印
+        if data == HEARTBEAT:
+            return
+
+        if len(data) < 3 or data[0] != 0x35:
+            logger.warning("接收到无效数据")
             return
 
-        cmd = data_list[1]
-        checksum = data_list[-1]
-        if checksum != calculate_checksum(data_list[:-1]):
-            print("校验和不匹配")
+        # 直接在原始字节上计算校验和，不复制数据
+        cmd = data[1]
+        checksum = data[-1]
+        if checksum != (sum(data) - checksum) & 0xFF:
+            logger.warning("校验和不匹配")
             return
 
         if cmd == 0x10:  # 设备信息响应
-            if len(data_list) == 10:
-                product_id = data_list[2]
-                version = data_list[3]
-                a_modes = data_list[4]
-                b_modes = data_list[5]
-                c_modes = data_list[6]
+            if len(data) == 10:
+                product_id = data[2]
+                version = data[3]
+                a_modes = data[4]
+                b_modes = data[5]
+                c_modes = data[6]
                 self.device_info = {
                     'product_id': product_id,
                     'version': version,
@@ -107,26 +153,24 @@ class YCY_FJB_Device:
                     'b_modes': b_modes,
                     'c_modes': c_modes
                 }
-                print(f"设备信息: 产品ID={product_id}, 版本={version}, "
-                      f"A模式数量={a_modes}, B模式数量={b_modes}, C模式数量={c_modes}")
+                logger.info("设备信息: 产品ID=%s, 版本=%s, A模式数量=%s, B模式数量=%s, C模式数量=%s",
+                            product_id, version, a_modes, b_modes, c_modes)
+                if self._info_event is not None:
+                    self._info_event.set()
             else:
-                print("设备信息长度无效")
+                logger.warning("设备信息长度无效")
         elif cmd == 0x13:  # 电量上报
-            if len(data_list) == 5 and data_list[2] == 0x01:
-                battery = data_list[3]
+            if len(data) == 5 and data[2] == 0x01:
+                battery = data[3]
                 self.battery_level = battery
-                print(f"电池电量: {battery}%")
+                logger.info("电池电量: %s%%", battery)
                 # 调用电池电量回调
                 if self.battery_callback:
                     self.battery_callback(battery)
             else:
-                print("电量上报长度无效")
+                logger.warning("电量上报长度无效")
         else:
-            if cmd == 0x14 and len(data_list) == 3 and data_list == [0x35, 0x14, 0x49]:
-                # 心跳包，静默忽略，不打印
-                pass
-            else:
-                print(f"未知命令: {cmd:02x}, 完整数据: {data_list}")
+            logger.warning("未知命令: %02x, 完整数据: %s", cmd, list(data))
 
     async def connect(self):
         """
@@ -135,30 +179,24 @@ class YCY_FJB_Device:
         返回：
         bool: 连接是否成功
         """
-        print("正在扫描设备...")
-        devices = await BleakScanner.discover(timeout=10.0)
-
-        target_device = None
-        for d in devices:
-            print(f"发现设备: {d.name} ({d.address})")
-            if d.name == self.device_name:
-                target_device = d
-                break
+        logger.info("正在扫描设备...")
+        # 发现目标设备后立即结束扫描，最长等待10秒
+        target_device = await BleakScanner.find_device_by_name(self.device_name, timeout=10.0)
 
         if not target_device:
-            print(f"未找到名为 '{self.device_name}' 的设备")
+            logger.warning("未找到名为 '%s' 的设备", self.device_name)
             return False
 
-        print(f"正在连接到 {target_device.name} ({target_device.address})")
+        logger.info("正在连接到 %s (%s)", target_device.name, target_device.address)
 
         self.client = BleakClient(target_device)
         await self.client.connect()
 
         if not self.client.is_connected:
-            print("连接失败")
+            logger.error("连接失败")
             return False
 
-        print("已连接。启动通知...")
+        logger.info("已连接。启动通知...")
         await self.client.start_notify(NOTIFY_CHAR_UUID, self.notification_handler)
 
         self._connected = True
@@ -170,14 +208,9 @@ class YCY_FJB_Device:
         """
         if self.client and self.client.is_connected:
             # 退出时关闭所有马达
-            await self.set_speed('A', 0)
-            await self.set_speed('B', 0)
-            await self.set_speed('C', 0)
-            await self.set_mode('A', 0)
-            await self.set_mode('B', 0)
-            await self.set_mode('C', 0)
+            await self.set_all({'A': 0, 'B': 0, 'C': 0}, {'A': 0, 'B': 0, 'C': 0})
             await self.client.disconnect()
-            print("已断开连接")
+            logger.info("已断开连接")
         self._connected = False
 
     async def get_device_info(self):
@@ -188,9 +221,13 @@ class YCY_FJB_Device:
         dict or None: 设备信息字典，包含product_id, version, a_modes, b_modes, c_modes
         """
         if not self._connected:
-            print("设备未连接")
+            logger.warning("设备未连接")
             return None
 
+        if self._info_event is None:
+            self._info_event = asyncio.Event()
+        self._info_event.clear()
+
         # 发送设备信息查询命令
         header = 0x35
         cmd = 0x10
@@ -198,10 +235,14 @@ class YCY_FJB_Device:
         checksum = calculate_checksum(data)
         data.append(checksum)
         await self.client.write_gatt_char(WRITE_CHAR_UUID, bytes(data))
-        print("已发送设备信息查询")
+        logger.debug("已发送设备信息查询")
 
-        # 等待响应
-        await asyncio.sleep(2)
+        # 等待响应，最长2秒
+        try:
+            await asyncio.wait_for(self._info_event.wait(), 2.0)
+        except asyncio.TimeoutError:
+            logger.warning("等待设备信息响应超时")
+            return None
         return self.device_info
 
     async def get_battery(self):
@@ -212,7 +253,7 @@ class YCY_FJB_Device:
         int or None: 电池电量百分比
         """
         if not self._connected:
-            print("设备未连接")
+            logger.warning("设备未连接")
             return None
 
         # 电量是自动上报的，这里返回当前值
@@ -229,6 +270,62 @@ class YCY_FJB_Device:
                      B: 0-20 (0=放气, 1=不吸不放, 2-20吸气)
                      C: 0-20 (0=关闭)
 
+        抛出：
+        ValueError: 参数无效
+        """
+        self._check_speed(motor, level)
+
+        self._set_level(motor, level)
+        await self._request_speed_flush()
+
+    async def set_mode(self, motor, mode_value):
+        """
+        设置马达模式
+
+        参数：
+        motor (str): 马达标识 ('A', 'B', 'C')
+        mode_value (int): 模式值 (0-7, 0=关闭)
+
+        抛出：
+        ValueError: 参数无效
+        """
+        self._check_mode(motor, mode_value)
+
+        await self._send_mode_control(motor, mode_value)
+
+    async def set_all(self, speeds=None, modes=None):
+        """
+        批量设置马达速率和模式
+
+        速率控制命令本身携带A/B/C三个通道，合并为一次写入；
+        模式控制命令每个马达一条，依次发送。
+
+        参数：
+        speeds (dict, optional): 速率配置，如 {'A': 10, 'C': 5}，未给出的通道保持当前速率
+        modes (dict, optional): 模式配置，如 {'B': 3}
+
+        抛出：
+        ValueError: 参数无效
+        """
+        speeds = speeds or {}
+        modes = modes or {}
+        for motor, level in speeds.items():
+            self._check_speed(motor, level)
+        for motor, mode_value in modes.items():
+            self._check_mode(motor, mode_value)
+
+        if speeds:
+            for motor, level in speeds.items():
+                self._set_level(motor, level)
+            await self._request_speed_flush()
+        # 同一特征值上的写入不能重叠（BlueZ 会以 InProgress 拒绝），逐条发送
+        for motor, mode_value in modes.items():
+            await self._send_mode_control(motor, mode_value)
+
+    def _check_speed(self, motor, level):
+        """
+        校验速率参数（内部方法）
+
         抛出：
         ValueError: 参数无效
         """
@@ -242,16 +339,9 @@ class YCY_FJB_Device:
             if not 0 <= level <= 20:
                 raise ValueError(f"{motor}速率级别必须在0-20之间")
 
-        self.current_levels[motor] = level
-        await self._send_speed_control()
-
-    async def set_mode(self, motor, mode_value):
+    def _check_mode(self, motor, mode_value):
         """
-        设置马达模式
-
-        参数：
-        motor (str): 马达标识 ('A', 'B', 'C')
-        mode_value (int): 模式值 (0-7, 0=关闭)
+        校验模式参数（内部方法）
 
         抛出：
         ValueError: 参数无效
@@ -262,7 +352,65 @@ class YCY_FJB_Device:
         if not 0 <= mode_value <= 7:
             raise ValueError("模式必须在0-7之间")
 
-        await self._send_mode_control(motor, mode_value)
+    def _set_level(self, motor, level):
+        """
+        更新速率控制命令帧中某个马达的速率，并重新计算校验和（内部方法）
+        """
+        pkt = self._speed_pkt
+        pkt[_SPEED_SLOT[motor]] = level
+        # 帧头与命令字之和为常量 0x47
+        pkt[5] = (0x47 + pkt[2] + pkt[3] + pkt[4]) & 0xFF
+
+    async def _request_speed_flush(self):
+        """
+        请求发送速率控制命令（内部方法）
+
+        合并窗口内的多次请求共用同一次写入，写入失败时异常传给所有请求方
+        """
+        if self._speed_flush is None:
+            self._speed_flush = asyncio.ensure_future(self._flush_speed())
+            self._speed_flush.add_done_callback(self._log_flush_error)
+        flush = self._speed_flush
+        self._flush_waiters[flush] = self._flush_waiters.get(flush, 0) + 1
+        try:
+            # 某个请求方被取消时不影响其他请求方共用的写入
+            await asyncio.shield(flush)
+        except asyncio.CancelledError:
+            self._flush_waiters[flush] -= 1
+            raise
+
+    def _log_flush_error(self, future):
+        """
+        取回合并写入的异常（内部方法）
+
+        仍有请求方等待时异常已传给它们，只在所有请求方都被取消时记录日志
+        """
+        waiters = self._flush_waiters.pop(future, 0)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None and not waiters:
+            logger.error("发送速率控制失败: %s", error)
+
+    async def _flush_speed(self):
+        """
+        等待合并窗口结束后发送一次速率控制命令（内部方法）
+        """
+        await asyncio.sleep(SPEED_COALESCE_DELAY)
+        # 此后的设置进入下一次写入
+        self._speed_flush = None
+        await self._send_speed_control()
+
+    async def _write(self, packet):
+        """
+        向写特征值发送一帧命令（内部方法）
+
+        速率与模式命令共用同一把锁，保证写入依次进行、互不重叠
+        """
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            await self.client.write_gatt_char(WRITE_CHAR_UUID, packet)
 
     async def _send_speed_control(self):
         """
@@ -271,16 +419,10 @@ class YCY_FJB_Device:
         if not self._connected:
             raise RuntimeError("设备未连接")
 
-        header = 0x35
-        cmd = 0x12
-        a_level = self.current_levels['A']
-        b_level = self.current_levels['B']
-        c_level = self.current_levels['C']
-        data = [header, cmd, a_level, b_level, c_level]
-        checksum = calculate_checksum(data)
-        data.append(checksum)
-        await self.client.write_gatt_char(WRITE_CHAR_UUID, bytes(data))
-        print(f"发送速率控制: A={a_level}, B={b_level}, C={c_level}")
+        # 发送快照，写入期间帧内容可能被后续设置修改
+        packet = bytes(self._speed_pkt)
+        await self._write(packet)
+        logger.debug("发送速率控制: A=%s, B=%s, C=%s", packet[2], packet[3], packet[4])
 
     async def _send_mode_control(self, motor, mode_value):
         """
@@ -293,22 +435,23 @@ class YCY_FJB_Device:
         if not self._connected:
             raise RuntimeError("设备未连接")
 
-        header = 0x35
-        cmd = 0x11
-        if motor == 'A':
-            motor_code = 0x01
-        elif motor == 'B':
-            motor_code = 0x12
-        elif motor == 'C':
-            motor_code = 0x14
-        else:
+        motor_code = MOTOR_CODES.get(motor)
+        if motor_code is None:
             raise ValueError("无效马达")
 
-        data = [header, cmd, motor_code, mode_value]
-        checksum = calculate_checksum(data)
-        data.append(checksum)
-        await self.client.write_gatt_char(WRITE_CHAR_UUID, bytes(data))
-        print(f"发送模式控制: {motor}马达 模式={mode_value}")
+        await self._write(_encode_mode(motor_code, mode_value))
+        logger.debug("发送模式控制: %s马达 模式=%s", motor, mode_value)
+
+    @property
+    def current_levels(self):
+        """
+        三个马达的当前速率
+
+        返回：
+        dict: {'A': 速率, 'B': 速率, 'C': 速率}
+        """
+        pkt = self._speed_pkt
+        return {'A': pkt[2], 'B': pkt[3], 'C': pkt[4]}
 
     @property
     def is_connected(self):
@@ -320,7 +463,7 @@ class YCY_FJB_Device:
         """
         return self._connected
 
-# 如果直接运行此模块，提供简单的测试
+# 如果直接运行此模块，提供简单的测试（在项目根目录执行 python -m core.ycy_fjb）
 if __name__ == "__main__":
     async def test():
         device = YCY_FJB_Device()
@@ -4,13 +4,30 @@
 负责加载、保存和管理配置文件
 """
 
+import atexit
+import copy
 import json
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, Set
+
+try:
+    # 可选依赖：C 实现的 JSON 库，未安装时使用标准库 json
+    import orjson
+except ImportError:
+    orjson = None
+
+# 两次写盘之间的最小间隔（秒），间隔内的保存只更新缓存
+FLUSH_INTERVAL = 1.0
 
 class ConfigManager:
     """
     配置管理器
+
+    配置在首次读取后缓存在内存中，读写时都复制数据，调用方修改返回值不会影响缓存；
+    保存时更新缓存并标记为待写入，写盘按时间间隔合并，间隔内的修改由定时器延后写出，
+    程序退出时也会调用 flush() 写出剩余修改。
     """
 
     def __init__(self, config_dir: str = "config"):
@@ -22,10 +39,22 @@ class ConfigManager:
         """
         self.config_dir = config_dir
         os.makedirs(self.config_dir, exist_ok=True)
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._last_flush = 0.0
+        # 延后写盘的定时器，以及保护缓存的锁（定时器在后台线程中写盘）
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+
+    def _config_path(self, config_name: str) -> str:
+        """
+        获取配置文件路径
+        """
+        return os.path.join(self.config_dir, f"{config_name}.json")
 
     def load_config(self, config_name: str) -> Dict[str, Any]:
         """
-        加载配置文件
+        加载配置（优先从缓存读取）
 
         参数：
         config_name (str): 配置文件名称（不含扩展名）
@@ -33,20 +62,36 @@ class ConfigManager:
         返回：
         dict: 配置数据
         """
-        config_path = os.path.join(self.config_dir, f"{config_name}.json")
+        with self._lock:
+            cached = self._cache.get(config_name)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+        config_path = self._config_path(config_name)
         if not os.path.exists(config_path):
             return {}
 
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            if orjson is not None:
+                with open(config_path, 'rb') as f:
+                    config_data = orjson.loads(f.read())
+            else:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config_data = json.load(f)
         except (json.JSONDecodeError, IOError) as e:
             print(f"加载配置文件失败: {e}")
             return {}
 
+        with self._lock:
+            self._cache.setdefault(config_name, config_data)
+            return copy.deepcopy(self._cache[config_name])
+
     def save_config(self, config_name: str, config_data: Dict[str, Any]) -> bool:
         """
-        保存配置文件
+        保存配置
+
+        更新缓存并标记待写入；距上次写盘超过 FLUSH_INTERVAL 时立即写盘，
+        否则在间隔结束时由定时器写盘
 
         参数：
         config_name (str): 配置文件名称（不含扩展名）
@@ -55,11 +100,60 @@ class ConfigManager:
         返回：
         bool: 保存是否成功
         """
-        config_path = os.path.join(self.config_dir, f"{config_name}.json")
+        with self._lock:
+            self._cache[config_name] = copy.deepcopy(config_data)
+            self._dirty.add(config_name)
+
+            remaining = FLUSH_INTERVAL - (time.monotonic() - self._last_flush)
+            if remaining < 0:
+                return self.flush()
+
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(remaining, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            return True
+
+    def flush(self) -> bool:
+        """
+        将所有待写入的配置写入文件
+
+        返回：
+        bool: 是否全部写入成功
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            self._last_flush = time.monotonic()
+            success = True
+            for config_name in list(self._dirty):
+                if self._write_config(config_name, self._cache[config_name]):
+                    self._dirty.discard(config_name)
+                else:
+                    success = False
+            return success
+
+    def _write_config(self, config_name: str, config_data: Dict[str, Any]) -> bool:
+        """
+        原子写入配置文件：先写临时文件再替换（内部方法）
+
+        返回：
+        bool: 写入是否成功
+        """
+        config_path = self._config_path(config_name)
+        tmp_path = config_path + ".tmp"
 
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                payload = orjson.dumps(config_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(config_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, config_path)
             return True
         except IOError as e:
             print(f"保存配置文件失败: {e}")
@@ -109,3 +203,5 @@ class ConfigManager:
 
 # 全局配置管理器实例
 config_manager = ConfigManager()
+# 退出时写出尚未写盘的配置
+atexit.register(config_manager.flush)
@@ -4,42 +4,42 @@
 负责统一日志格式和管理
 """
 
+import atexit
+import functools
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
-class LoggerManager:
-    """
-    日志管理器
-    """
-
-    def __init__(self, log_dir: str = "logs"):
-        """
-        初始化日志管理器
+# 已创建的日志记录器按 (目录, 名称, 文件) 缓存；锁保证并发首次获取时只添加一次处理器
+_lock = threading.Lock()
 
-        参数：
-        log_dir (str): 日志文件目录
-        """
-        self.log_dir = log_dir
-        os.makedirs(self.log_dir, exist_ok=True)
+@functools.lru_cache(maxsize=None)
+def _make(log_dir: str, name: str, log_file: Optional[str]) -> logging.Logger:
+    """
+    创建并配置日志记录器（结果缓存复用）
 
-    def get_logger(self, name: str, log_file: Optional[str] = None) -> logging.Logger:
-        """
-        获取日志记录器
+    日志记录器只挂载 QueueHandler，记录入队后立即返回；
+    控制台与文件输出由各自的 QueueListener 后台线程完成，
+    避免在事件循环中执行阻塞的写操作。
 
-        参数：
-        name (str): 日志记录器名称
-        log_file (str, optional): 日志文件名称
+    参数：
+    log_dir (str): 日志文件目录
+    name (str): 日志记录器名称
+    log_file (str, optional): 日志文件名称
 
-        返回：
-        logging.Logger: 日志记录器
-        """
+    返回：
+    logging.Logger: 日志记录器
+    """
+    with _lock:
         logger = logging.getLogger(name)
-        logger.setLevel(logging.DEBUG)
 
         # 避免重复添加处理器
         if not logger.handlers:
+            handlers = []
+
             # 控制台处理器
             console_handler = logging.StreamHandler()
             console_handler.setLevel(logging.INFO)
@@ -47,11 +47,12 @@ class LoggerManager:
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
             console_handler.setFormatter(console_formatter)
-            logger.addHandler(console_handler)
+            handlers.append(console_handler)
 
             # 文件处理器（如果指定了日志文件）
             if log_file:
-                log_path = os.path.join(self.log_dir, log_file)
+                os.makedirs(log_dir, exist_ok=True)
+                log_path = os.path.join(log_dir, log_file)
                 file_handler = RotatingFileHandler(
                     log_path, maxBytes=10*1024*1024, backupCount=5
                 )
@@ -60,9 +61,47 @@ class LoggerManager:
                     '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
                 )
                 file_handler.setFormatter(file_formatter)
-                logger.addHandler(file_handler)
+                handlers.append(file_handler)
 
-        return logger
+            # 日志记录器级别与处理器中最低的级别一致，被过滤的记录在 isEnabledFor 处即返回
+            logger.setLevel(min(h.level for h in handlers))
+
+            # 记录经队列交给后台线程输出
+            log_queue = queue.Queue(-1)
+            logger.addHandler(QueueHandler(log_queue))
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            # 退出时输出队列中剩余的记录
+            atexit.register(listener.stop)
+
+    return logger
+
+class LoggerManager:
+    """
+    日志管理器
+    """
+
+    def __init__(self, log_dir: str = "logs"):
+        """
+        初始化日志管理器
+
+        参数：
+        log_dir (str): 日志文件目录（首次写日志文件时创建）
+        """
+        self.log_dir = log_dir
+
+    def get_logger(self, name: str, log_file: Optional[str] = None) -> logging.Logger:
+        """
+        获取日志记录器
+
+        参数：
+        name (str): 日志记录器名称
+        log_file (str, optional): 日志文件名称
+
+        返回：
+        logging.Logger: 日志记录器
+        """
+        return _make(self.log_dir, name, log_file)
 
 # 全局日志管理器实例
 logger_manager = LoggerManager()